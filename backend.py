@@ -3,40 +3,222 @@ BACKEND - Flask REST API + Database Operations
 Receives sensor data, stores in PostgreSQL, exports as GeoJSON
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from psycopg2.extras import execute_values
+import atexit
 import json
-from config import DB_PARAMS
+import threading
+import time
+import orjson
+from config import DB_PARAMS, DB_UNLOGGED
 
 app = Flask(__name__)
 
+# Decode NUMERIC columns straight to float instead of Decimal - every consumer wants floats
+DEC2FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values, 'DEC2FLOAT',
+    lambda value, cur: float(value) if value is not None else None)
+psycopg2.extensions.register_type(DEC2FLOAT)
+
+# Hot statements are parsed and planned once per pooled connection (PREPARE), then each
+# request only sends EXECUTE with its parameters
+# Defaults and timestamp formatting happen in SQL so rows come back ready to serialize
+_READING_COLUMNS = """id, sensor_id, water_level_cm, latitude, longitude,
+                      COALESCE(power_consumption_watts, 0.0),
+                      COALESCE(alert_status, FALSE),
+                      COALESCE(NULLIF(alert_type, ''), 'normal_reading'),
+                      COALESCE(capacity_percentage, 0.0),
+                      TO_CHAR(recorded_at, 'YYYY-MM-DD HH24:MI:SS')"""
+READING_FIELDS = ("id", "sensor_id", "water_level_cm", "latitude", "longitude", "power_consumption_watts",
+                  "alert_status", "alert_type", "capacity_percentage", "recorded_at")
+
+PREPARED_STATEMENTS = {
+    "ins_wl_geo": """
+        PREPARE ins_wl_geo (varchar, numeric, numeric, numeric, float, boolean, boolean, varchar, timestamp) AS
+        INSERT INTO water_levels 
+        (sensor_id, water_level_cm, latitude, longitude, location, power_consumption_watts, 
+         is_simulated, alert_status, alert_type, recorded_at) 
+        VALUES ($1, $2, $3, $4, ST_SetSRID(ST_MakePoint($4, $3), 4326), $5, $6, $7, $8, $9)
+        RETURNING capacity_percentage;
+    """,
+    "ins_wl": """
+        PREPARE ins_wl (varchar, numeric, float, boolean, boolean, varchar, timestamp) AS
+        INSERT INTO water_levels (sensor_id, water_level_cm, power_consumption_watts, is_simulated, alert_status, alert_type, recorded_at) 
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        RETURNING capacity_percentage;
+    """,
+    # One plan for every dashboard filter: alerts_only wins, otherwise filter by source.
+    # $4 is since_id - only rows newer than what the client already has (0 = everything)
+    "sel_wl": f"""
+        PREPARE sel_wl (boolean, varchar, int, int) AS
+        SELECT {_READING_COLUMNS} FROM water_levels
+        WHERE water_levels.id > $4
+          AND (($1 AND alert_status)
+               OR (NOT $1 AND ($2 = 'all'
+                               OR ($2 = 'real' AND NOT is_simulated)
+                               OR ($2 = 'simulated' AND is_simulated))))
+        ORDER BY water_levels.recorded_at DESC LIMIT $3;
+    """,
+    # Cheap change detector for ETags - both maxes are single index probes
+    "sel_wl_version": """
+        PREPARE sel_wl_version AS
+        SELECT max(id), max(recorded_at) FROM water_levels;
+    """,
+}
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers whether PREPARED_STATEMENTS exist in its session"""
+    prepared = False
+
+class PersistentConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that keeps every connection it opens instead of closing the extras
+    
+    The stock pool closes a returned connection once minconn are already idle, so under load
+    most requests would reconnect (and re-PREPARE). This one opens minconn up front and grows
+    lazily up to maxconn, keeping each connection - and its prepared statements - for reuse.
+    """
+    def __init__(self, minconn, maxconn, *args, **kwargs):
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        # putconn only keeps a connection while fewer than minconn are idle - raise that to maxconn
+        self.minconn = maxconn
+
+# One pool per process - handing out an already-open connection is far cheaper
+# than a fresh TCP + auth handshake on every request
+POOL_MAXCONN = 20
+POOL = PersistentConnectionPool(minconn=2, maxconn=POOL_MAXCONN, connection_factory=PreparedConnection, **DB_PARAMS)
+atexit.register(POOL.closeall)
+
+# ThreadedConnectionPool raises PoolError instead of waiting once all maxconn connections
+# are out, and a gevent worker serves far more requests at once than that. Callers queue on
+# this semaphore for a free connection (gevent's monkey patch makes the wait cooperative)
+POOL_WAIT_SECONDS = 10
+_pool_slots = threading.BoundedSemaphore(POOL_MAXCONN)
+
+# Using PostGIS ST_AsGeoJSON to turn each row into a proper GeoJSON Feature (needs PostGIS 3.0+)
+# This returns coordinates and properties in the format QGIS expects
+GEOJSON_SQL = """
+    SELECT json_build_object(
+        'type', 'FeatureCollection',
+        'features', COALESCE(json_agg(ST_AsGeoJSON(t.*)::json), '[]'::json)
+    ) FROM (
+        -- Newest N rows first (index-only scan on idx_geojson_location_cover), then PostGIS
+        -- serializes each row as a Feature: geom becomes the geometry, the rest its properties
+        SELECT id, sensor_id, water_level_cm,
+               TO_CHAR(recorded_at, 'YYYY-MM-DD HH24:MI:SS') AS recorded_at,
+               location AS geom
+        FROM water_levels 
+        WHERE location IS NOT NULL 
+        ORDER BY water_levels.recorded_at DESC
+        LIMIT %s
+    ) t
+"""
+
+GEOJSON_TEXT_SQL = f"SELECT ({GEOJSON_SQL})::text;"
+
+# The default export is served from a materialized view so repeated downloads skip the
+# JSON aggregation; the view is refreshed on read once it is older than this. The view
+# records when it was built, so every worker process agrees on how stale it is
+GEOJSON_DEFAULT_LIMIT = 100
+GEOJSON_REFRESH_SECONDS = 10
+# Advisory lock key - lets one request refresh the view while the others keep reading it
+GEOJSON_REFRESH_LOCK = 7_240_001
+
+GEOJSON_VIEW_SQL = """
+    SELECT fc::text, refreshed_at < now() - make_interval(secs => %s) FROM water_levels_geojson;
+"""
+
+# Bulk ingestion - execute_values expands the single VALUES %s into one row per template
+BULK_INSERT_SQL = """
+    INSERT INTO water_levels 
+    (sensor_id, water_level_cm, latitude, longitude, location, power_consumption_watts, 
+     is_simulated, alert_status, alert_type, recorded_at) 
+    VALUES %s;
+"""
+BULK_INSERT_TEMPLATE = "(%s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s, %s, %s, %s)"
+
+# Dashboards poll GET /api/water-level with the same parameters over and over; keep each
+# serialized answer for a second (per process) and drop them all when a reading arrives.
+# limit and since_id come from the client, so expired answers are pruned on insert and the
+# cache never holds more than READINGS_CACHE_MAX_ENTRIES
+READINGS_CACHE_SECONDS = 1
+READINGS_CACHE_MAX_ENTRIES = 256
+_readings_cache = {}
+
+VALID_ALERT_TYPES = ['normal_reading', 'blockage_detected', 'blockage_cleared']
+
 # ============= DATABASE OPERATIONS =============
 # All the SQL stuff happens here - inserting data, pulling it back out, etc.
 
+def checkout_connection():
+    """Take a connection from the pool, waiting up to POOL_WAIT_SECONDS for one to free up"""
+    if not _pool_slots.acquire(timeout=POOL_WAIT_SECONDS):
+        raise psycopg2.pool.PoolError("timed out waiting for a database connection")
+    try:
+        return POOL.getconn()
+    except Exception:
+        _pool_slots.release()
+        raise
+
+def release_connection(conn):
+    """Hand a connection back to the pool and wake the next caller waiting for one"""
+    try:
+        POOL.putconn(conn)
+    finally:
+        _pool_slots.release()
+
 def execute_query(sql, params=None, fetch=False):
     """Run any SQL query - useful to keep this centralized so we don't repeat code"""  
     try:
-        with psycopg2.connect(**DB_PARAMS) as conn:
-            with conn.cursor() as cur:
-                cur.execute(sql, params or ())
-                if fetch:
-                    return cur.fetchall()
-                conn.commit()
+        conn = checkout_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, params or ())
+                    if fetch:
+                        return cur.fetchall()
+                    conn.commit()
+        finally:
+            release_connection(conn)
         return True
     except Exception as e:
         print(f"❌ Database error: {e}")
         return None
 
+def get_connection():
+    """Check a connection out of the pool, preparing the hot statements on its first use
+    
+    Preparing lazily (not when the pool opens connections at import) means the table
+    already exists by the time the first request comes in. Hand it back with release_connection.
+    """
+    conn = checkout_connection()
+    if not conn.prepared:
+        try:
+            with conn.cursor() as cur:
+                for statement in PREPARED_STATEMENTS.values():
+                    cur.execute(statement)
+            conn.commit()
+            conn.prepared = True
+        except Exception:
+            conn.rollback()
+            release_connection(conn)
+            raise
+    return conn
+
 def init_db():
     """Set up the database tables and PostGIS for map stuff - run this once at startup"""
     # First, enable PostGIS extension for geospatial queries (maps, coordinates, etc)
     sql_postgis = "CREATE EXTENSION IF NOT EXISTS postgis;"
-    execute_query(sql_postgis)
     
     # Create the main table - stores every sensor reading with location coordinates
     # location column uses PostGIS POINT to store lat/lon as a single geometry for faster queries
-    sql_create = """
-    CREATE TABLE IF NOT EXISTS water_levels (
+    # DB_UNLOGGED (dev only) skips WAL for faster inserts - the table is emptied after a crash
+    persistence = "UNLOGGED" if DB_UNLOGGED else "LOGGED"
+    table_kind = "UNLOGGED TABLE" if DB_UNLOGGED else "TABLE"
+    sql_create = f"""
+    CREATE {table_kind} IF NOT EXISTS water_levels (
         id SERIAL PRIMARY KEY,
         sensor_id VARCHAR(50) NOT NULL,
         water_level_cm NUMERIC(5, 2) NOT NULL,
@@ -45,6 +227,7 @@ def init_db():
         location GEOMETRY(POINT, 4326),
         recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
+    ALTER TABLE water_levels SET {persistence};
     """
     
     sql_alter = """
@@ -55,51 +238,102 @@ def init_db():
     ALTER TABLE water_levels ADD COLUMN IF NOT EXISTS is_simulated BOOLEAN DEFAULT FALSE;
     ALTER TABLE water_levels ADD COLUMN IF NOT EXISTS alert_status BOOLEAN DEFAULT FALSE;
     ALTER TABLE water_levels ADD COLUMN IF NOT EXISTS alert_type VARCHAR(50);
-    ALTER TABLE water_levels ADD COLUMN IF NOT EXISTS capacity_percentage NUMERIC(5, 2);
     """
     
-    # Indexes speed up searches - one for location-based queries, one for time-based sorting
+    # capacity_percentage is derived by Postgres from the 47.5cm basin height (BAMBI.pdf),
+    # so inserts don't compute or send it. An older plain column is swapped for the generated one
+    sql_capacity = """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_name = 'water_levels' AND column_name = 'capacity_percentage'
+                     AND is_generated = 'NEVER') THEN
+            ALTER TABLE water_levels DROP COLUMN capacity_percentage;
+        END IF;
+    END $$;
+    ALTER TABLE water_levels ADD COLUMN IF NOT EXISTS capacity_percentage NUMERIC(5, 2)
+        GENERATED ALWAYS AS ((water_level_cm / 47.5) * 100) STORED;
+    """
+    
+    # Indexes speed up searches - one for location-based queries, one for time-based sorting.
+    # No partial indexes for the alerts-only/simulated-only filters: sel_wl takes the filter as
+    # parameters, so its generic plan can't prove their WHERE clauses and would never use them.
+    # location only ever holds POINTs, so SP-GiST is smaller and faster than GiST (PostGIS 2.5+);
+    # the DO block drops an older GiST idx_location so it gets rebuilt as SP-GiST.
+    # No BRIN index on recorded_at: nothing filters on a time window, and BRIN can't serve the
+    # ORDER BY ... LIMIT every reader uses - the B-tree does that.
+    # idx_geojson_location_cover holds every column the GeoJSON export reads, so it never touches the table
     sql_indexes = """
-    CREATE INDEX IF NOT EXISTS idx_location ON water_levels USING GIST(location);
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM pg_class c JOIN pg_am am ON am.oid = c.relam
+                   WHERE c.relname = 'idx_location' AND am.amname = 'gist') THEN
+            DROP INDEX idx_location;
+        END IF;
+    END $$;
+    CREATE INDEX IF NOT EXISTS idx_location ON water_levels USING SPGIST(location);
     CREATE INDEX IF NOT EXISTS idx_recorded_at ON water_levels(recorded_at DESC);
+    DROP INDEX IF EXISTS idx_recorded_at_brin;
+    DROP INDEX IF EXISTS idx_alerts;
+    DROP INDEX IF EXISTS idx_simulated;
+    DROP INDEX IF EXISTS idx_geojson_cover;
+    CREATE INDEX IF NOT EXISTS idx_geojson_location_cover ON water_levels(recorded_at DESC)
+        INCLUDE (id, sensor_id, water_level_cm, location)
+        WHERE location IS NOT NULL;
+    """
+    
+    # Recreated on every startup so it always matches the current GEOJSON_SQL.
+    # The unique index on its single row allows REFRESH ... CONCURRENTLY, which doesn't block readers
+    sql_views = f"""
+    DROP MATERIALIZED VIEW IF EXISTS water_levels_geojson;
+    CREATE MATERIALIZED VIEW water_levels_geojson AS
+    SELECT 1 AS id, ({GEOJSON_SQL}) AS fc, now() AS refreshed_at;
+    CREATE UNIQUE INDEX idx_water_levels_geojson_id ON water_levels_geojson(id);
     """
     
-    # Run all the setup commands
-    execute_query(sql_create)
-    execute_query(sql_alter)
-    execute_query(sql_indexes)
+    # Run all the setup commands - everything goes over as one multi-statement execute in a
+    # single transaction: one round-trip, one commit, and a failed step rolls the whole setup back
+    execute_query(sql_postgis + sql_create + sql_alter + sql_capacity + sql_indexes + sql_views,
+                  (GEOJSON_DEFAULT_LIMIT,))
     
     print("✅ PostGIS extension enabled!")
     print("✅ Table 'water_levels' with geospatial support is ready!")
 
-def export_to_geojson(limit=100):
-    """Convert sensor data to GeoJSON format - useful for QGIS and mapping tools"""
-    # Using PostgreSQL's json_build_object to structure the data as proper GeoJSON
-    # This returns coordinates and properties in the format QGIS expects
-    sql = f"""
-    SELECT json_build_object(
-        'type', 'FeatureCollection',
-        'features', COALESCE(json_agg(
-            json_build_object(
-                'type', 'Feature',
-                'geometry', json_build_object(
-                    'type', 'Point',
-                    'coordinates', ARRAY[longitude, latitude]
-                ),
-                'properties', json_build_object(
-                    'id', id,
-                    'sensor_id', sensor_id,
-                    'water_level_cm', water_level_cm,
-                    'recorded_at', TO_CHAR(recorded_at, 'YYYY-MM-DD HH24:MI:SS')
-                )
-            ) ORDER BY recorded_at DESC
-        ), '[]'::json)
-    ) FROM water_levels 
-    WHERE latitude IS NOT NULL AND longitude IS NOT NULL 
-    LIMIT {limit};
+def read_geojson_view():
+    """Read the cached default GeoJSON export as text, refreshing it first if it has gone stale
+    
+    Only the request that wins the advisory lock refreshes (CONCURRENTLY, so readers aren't
+    blocked); requests arriving meanwhile serve the copy they already read instead of all
+    rebuilding it at once.
     """
+    conn = get_connection()
     try:
-        result = execute_query(sql, fetch=True)
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(GEOJSON_VIEW_SQL, (GEOJSON_REFRESH_SECONDS,))
+                fc, stale = cur.fetchone()
+                if not stale:
+                    return fc
+                cur.execute("SELECT pg_try_advisory_xact_lock(%s);", (GEOJSON_REFRESH_LOCK,))
+                if not cur.fetchone()[0]:
+                    return fc
+                cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY water_levels_geojson;")
+                cur.execute(GEOJSON_VIEW_SQL, (GEOJSON_REFRESH_SECONDS,))
+                return cur.fetchone()[0]
+    finally:
+        release_connection(conn)
+
+def export_to_geojson(limit=GEOJSON_DEFAULT_LIMIT):
+    """Convert sensor data to GeoJSON format - useful for QGIS and mapping tools
+    
+    The default export is read from the water_levels_geojson materialized view, refreshed
+    at most every GEOJSON_REFRESH_SECONDS across all workers; other limits are built live.
+    Returns the FeatureCollection as JSON text straight from Postgres, ready to send as-is.
+    """
+    try:
+        if limit == GEOJSON_DEFAULT_LIMIT:
+            return read_geojson_view()
+        result = execute_query(GEOJSON_TEXT_SQL, (limit,), fetch=True)
         if result and len(result) > 0 and result[0][0]:
             return result[0][0]
         return None
@@ -128,32 +362,29 @@ def receive_data():
         if not sensor_id or water_level is None:
             return jsonify({"error": "Missing sensor_id or water_level_cm"}), 400
         
-        # Calculate capacity percentage (47.5cm basin height per BAMBI.pdf)
-        BASIN_HEIGHT_CM = 47.5
-        capacity_pct = (water_level / BASIN_HEIGHT_CM) * 100
-        
         # Validate alert type
-        valid_alert_types = ['normal_reading', 'blockage_detected', 'blockage_cleared']
-        if alert_type not in valid_alert_types:
+        if alert_type not in VALID_ALERT_TYPES:
             alert_type = 'normal_reading'
 
-        with psycopg2.connect(**DB_PARAMS) as conn:
-            with conn.cursor() as cur:
-                if latitude and longitude:
-                    cur.execute("""
-                        INSERT INTO water_levels 
-                        (sensor_id, water_level_cm, latitude, longitude, location, power_consumption_watts, 
-                         is_simulated, alert_status, alert_type, capacity_percentage, recorded_at) 
-                        VALUES (%s, %s, %s, %s, ST_SetSRID(ST_MakePoint(%s, %s), 4326), %s, %s, %s, %s, %s, %s);
-                    """, (sensor_id, water_level, latitude, longitude, longitude, latitude, 
-                          power_consumption, is_simulated, alert_status, alert_type, capacity_pct, mcu_timestamp))
-                else:
-                    cur.execute("""
-                        INSERT INTO water_levels (sensor_id, water_level_cm, power_consumption_watts, is_simulated, alert_status, alert_type, capacity_percentage, recorded_at) 
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-                    """, (sensor_id, water_level, power_consumption, is_simulated, alert_status, alert_type, capacity_pct, mcu_timestamp))
-                conn.commit()
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    if latitude and longitude:
+                        cur.execute("EXECUTE ins_wl_geo (%s, %s, %s, %s, %s, %s, %s, %s, %s);",
+                                    (sensor_id, water_level, latitude, longitude, power_consumption,
+                                     is_simulated, alert_status, alert_type, mcu_timestamp))
+                    else:
+                        cur.execute("EXECUTE ins_wl (%s, %s, %s, %s, %s, %s, %s);",
+                                    (sensor_id, water_level, power_consumption, is_simulated,
+                                     alert_status, alert_type, mcu_timestamp))
+                    # Computed by the generated column
+                    capacity_pct = cur.fetchone()[0]
+                    conn.commit()
+        finally:
+            release_connection(conn)
         
+        _readings_cache.clear()
         if alert_status:
             print(f"🚨 ALERT LOGGED: {sensor_id} | Type: {alert_type} | Level: {water_level}cm ({capacity_pct:.1f}%)")
         
@@ -161,6 +392,75 @@ def receive_data():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/water-level/bulk', methods=['POST'])
+def receive_bulk():
+    """Accept a JSON array of sensor readings and store them with a single multi-row INSERT
+    
+    Same fields as the single-reading POST - useful when a sensor uploads buffered readings
+    """
+    try:
+        readings = request.get_json()
+        if not isinstance(readings, list) or not readings:
+            return jsonify({"error": "Expected a non-empty JSON array of readings"}), 400
+        
+        rows = []
+        for index, data in enumerate(readings):
+            if not isinstance(data, dict):
+                return jsonify({"error": f"Reading {index}: expected a JSON object"}), 400
+            sensor_id = data.get('sensor_id')
+            water_level = data.get('water_level_cm')
+            if not sensor_id or water_level is None:
+                return jsonify({"error": f"Reading {index}: missing sensor_id or water_level_cm"}), 400
+            
+            latitude = data.get('latitude')
+            longitude = data.get('longitude')
+            # Readings without both coordinates get NULL location (ST_MakePoint(NULL, NULL) is NULL)
+            if not (latitude and longitude):
+                latitude = longitude = None
+            
+            alert_type = data.get('alert_type', 'normal_reading')
+            if alert_type not in VALID_ALERT_TYPES:
+                alert_type = 'normal_reading'
+            
+            rows.append((sensor_id, water_level, latitude, longitude, longitude, latitude,
+                         data.get('power_consumption_watts', 0.0), data.get('is_simulated', False),
+                         data.get('alert_status', False), alert_type, data.get('mcu_timestamp')))
+        
+        # One transaction, one statement per 500 rows instead of one round-trip per reading
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    execute_values(cur, BULK_INSERT_SQL, rows, template=BULK_INSERT_TEMPLATE, page_size=500)
+                    conn.commit()
+        finally:
+            release_connection(conn)
+        
+        _readings_cache.clear()
+        return jsonify({"status": "success", "message": "Data saved!", "count": len(rows)}), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def readings_response(etag, body=None):
+    """Build the GET /api/water-level response - an empty 304 if the client already has this ETag"""
+    if body is None or request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
+def cache_readings(cache_key, etag, body):
+    """Remember a serialized readings answer, dropping expired ones and the oldest past the cap"""
+    now = time.monotonic()
+    for key, (expires_at, _, _) in list(_readings_cache.items()):
+        if expires_at <= now:
+            _readings_cache.pop(key, None)
+    while len(_readings_cache) >= READINGS_CACHE_MAX_ENTRIES:
+        # Dicts keep insertion order, so the first key is the oldest answer
+        _readings_cache.pop(next(iter(_readings_cache)), None)
+    _readings_cache[cache_key] = (now + READINGS_CACHE_SECONDS, etag, body)
+
 @app.route('/api/water-level', methods=['GET'])
 def get_data():
     """Fetch sensor readings for dashboard with alert tracking per BAMBI.pdf spec
@@ -169,68 +469,65 @@ def get_data():
     - limit: Number of recent readings (default: 100, max: 1000)
     - source: 'real' (hardware), 'simulated' (simulator), 'all' (default)
     - alerts_only: 'true' to show only alerting readings
+    - since_id: Only readings with a higher id (lets a dashboard fetch just what's new)
+    
+    Responses carry a weak ETag built from the newest id/timestamp, so a client sending it
+    back in If-None-Match gets an empty 304 until a new reading arrives. Identical queries
+    within READINGS_CACHE_SECONDS are answered from memory without touching the database.
     """
     try:
         limit = request.args.get('limit', default=100, type=int)
         limit = max(10, min(limit, 1000))
         source = request.args.get('source', default='all').lower()
+        if source not in ('real', 'simulated'):
+            source = 'all'
         alerts_only = request.args.get('alerts_only', default='false').lower() == 'true'
+        since_id = max(0, request.args.get('since_id', default=0, type=int))
         
-        with psycopg2.connect(**DB_PARAMS) as conn:
-            with conn.cursor() as cur:
-                if alerts_only:
-                    cur.execute("""
-                        SELECT id, sensor_id, water_level_cm, latitude, longitude, power_consumption_watts, 
-                               alert_status, alert_type, capacity_percentage, recorded_at
-                        FROM water_levels WHERE alert_status = TRUE 
-                        ORDER BY recorded_at DESC LIMIT %s;
-                    """, (limit,))
-                elif source == 'real':
-                    cur.execute("""
-                        SELECT id, sensor_id, water_level_cm, latitude, longitude, power_consumption_watts, 
-                               alert_status, alert_type, capacity_percentage, recorded_at 
-                        FROM water_levels WHERE is_simulated = FALSE 
-                        ORDER BY recorded_at DESC LIMIT %s;
-                    """, (limit,))
-                elif source == 'simulated':
-                    cur.execute("""
-                        SELECT id, sensor_id, water_level_cm, latitude, longitude, power_consumption_watts, 
-                               alert_status, alert_type, capacity_percentage, recorded_at 
-                        FROM water_levels WHERE is_simulated = TRUE 
-                        ORDER BY recorded_at DESC LIMIT %s;
-                    """, (limit,))
-                else:
-                    cur.execute("""
-                        SELECT id, sensor_id, water_level_cm, latitude, longitude, power_consumption_watts, 
-                               alert_status, alert_type, capacity_percentage, recorded_at 
-                        FROM water_levels ORDER BY recorded_at DESC LIMIT %s;
-                    """, (limit,))
-                rows = cur.fetchall()
+        cache_key = f"wl:{source}:{alerts_only}:{limit}:{since_id}"
+        cached = _readings_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            _, etag, body = cached
+            return readings_response(etag, body)
+        
+        conn = get_connection()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("EXECUTE sel_wl_version;")
+                    max_id, max_recorded_at = cur.fetchone()
+                    etag = f"{max_id or 0}-{int(max_recorded_at.timestamp()) if max_recorded_at else 0}"
+                    if request.if_none_match.contains_weak(etag):
+                        return readings_response(etag)
+                    
+                    cur.execute("EXECUTE sel_wl (%s, %s, %s, %s);", (alerts_only, source, limit, since_id))
+                    rows = cur.fetchall()
+        finally:
+            release_connection(conn)
         
-        results = [{
-            "id": row[0],
-            "sensor_id": row[1],
-            "water_level_cm": float(row[2]),
-            "latitude": float(row[3]) if row[3] else None,
-            "longitude": float(row[4]) if row[4] else None,
-            "power_consumption_watts": float(row[5]) if row[5] else 0.0,
-            "alert_status": row[6] if row[6] is not None else False,
-            "alert_type": row[7] if row[7] else "normal_reading",
-            "capacity_percentage": float(row[8]) if row[8] else 0.0,
-            "recorded_at": row[9].strftime("%Y-%m-%d %H:%M:%S")
-        } for row in rows]
+        results = [dict(zip(READING_FIELDS, row)) for row in rows]
         
-        return jsonify({"status": "success", "data": results, "count": len(results)}), 200
+        # orjson serializes in C and hands back bytes - much cheaper than jsonify for 1000 rows
+        body = orjson.dumps({"status": "success", "data": results, "count": len(results)})
+        cache_readings(cache_key, etag, body)
+        return readings_response(etag, body)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/export/geojson', methods=['GET'])
 def export_geojson():
-    """Let users download all sensor data in GeoJSON format"""
+    """Let users download all sensor data in GeoJSON format
+    
+    Query parameters:
+    - limit: Number of most recent located readings (default: 100, max: 5000)
+    """
     try:
-        geojson_data = export_to_geojson(limit=100)
+        limit = request.args.get('limit', default=GEOJSON_DEFAULT_LIMIT, type=int)
+        limit = max(1, min(limit, 5000))
+        geojson_data = export_to_geojson(limit=limit)
         if geojson_data:
-            return jsonify(geojson_data), 200
+            # Already serialized by Postgres - no need to parse and re-dump it through jsonify
+            return Response(geojson_data, mimetype='application/json'), 200
         else:
             return jsonify({"error": "No geospatial data available."}), 404
     except Exception as e:
@@ -0,0 +1,36 @@
+"""
+Check Data - Quick look at what's in the water_levels table
+Run anytime: python check_data.py
+"""
+
+from db import connection
+
+# Totals and the 5 latest readings in one round trip instead of three separate queries
+SQL_SUMMARY = """
+WITH totals AS (
+    SELECT count(*) AS total,
+           count(*) FILTER (WHERE latitude IS NOT NULL AND longitude IS NOT NULL) AS with_coords
+    FROM water_levels
+), latest AS (
+    SELECT id, sensor_id, water_level_cm, latitude, longitude,
+           TO_CHAR(recorded_at, 'YYYY-MM-DD HH24:MI:SS') AS recorded_at
+    FROM water_levels ORDER BY recorded_at DESC LIMIT 5
+)
+SELECT totals.total, totals.with_coords, (SELECT json_agg(latest) FROM latest)
+FROM totals;
+"""
+
+try:
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(SQL_SUMMARY)
+            total, with_coords, latest = cur.fetchone()
+    
+    print(f"📊 Total readings: {total}")
+    print(f"🗺️ With coordinates: {with_coords}")
+    print("🕒 Latest readings:")
+    for row in latest or []:
+        print(f"   #{row['id']} {row['sensor_id']} | {row['water_level_cm']} cm | "
+              f"({row['latitude']}, {row['longitude']}) | {row['recorded_at']}")
+except Exception as e:
+    print(f"❌ Error: {e}")
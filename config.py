@@ -1,16 +1,27 @@
+import functools
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
-# Load database credentials from .env (keep passwords out of version control!)
-load_dotenv()
+@functools.lru_cache(maxsize=1)
+def _load():
+    """Read .env once per process and build the connection settings"""
+    # Load database credentials from .env (keep passwords out of version control!)
+    # Point straight at the file next to this module so python-dotenv skips its directory search
+    load_dotenv(Path(__file__).with_name(".env"))
+    return {
+        "dbname": "postgres",
+        "user": "postgres",
+        "password": os.getenv("DB_PASSWORD"),
+        "host": "127.0.0.1",
+        "port": "5432"
+    }
 
-DB_PARAMS = {
-    "dbname": "postgres",
-    "user": "postgres",
-    "password": os.getenv("DB_PASSWORD"),
-    "host": "127.0.0.1",
-    "port": "5432"
-}
+DB_PARAMS = _load()
+
+# Dev only: DB_UNLOGGED=true makes water_levels an UNLOGGED table (no WAL, much faster inserts,
+# but the data is wiped if Postgres crashes) - leave unset for real deployments
+DB_UNLOGGED = os.getenv("DB_UNLOGGED", "false").lower() == "true"
 
 # Flask API endpoint - sensors and frontend talk to this
 API_URL = "http://127.0.0.1:5000/api/water-level"
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+DB - Shared PostgreSQL connection pool for the maintenance scripts
+Use: with connection() as conn: ...   (borrowed from the pool, committed on success)
+"""
+
+import atexit
+import functools
+from contextlib import contextmanager
+from psycopg2.pool import ThreadedConnectionPool
+from config import DB_PARAMS
+
+@functools.lru_cache(maxsize=1)
+def get_pool():
+    """Open the pool on first use - one per process, closed automatically at exit"""
+    pool = ThreadedConnectionPool(minconn=1, maxconn=10, **DB_PARAMS)
+    atexit.register(pool.closeall)
+    return pool
+
+@contextmanager
+def connection():
+    """Borrow a pooled connection - commits if the block succeeds, rolls back if it raises"""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
@@ -0,0 +1,31 @@
+"""
+Fix Data - Backfill missing coordinates so every reading shows up on the map
+Run once: python fix_data.py
+"""
+
+from db import connection
+
+# Default monitoring region (same coordinates as the Arduino firmware)
+DEFAULT_LAT = 8.7465
+DEFAULT_LON = 127.3851
+
+# latitude, longitude and the PostGIS location are all filled in one pass over the table -
+# rows that already have lat/lon keep them and just get their missing location built from them
+SQL_BACKFILL = """
+UPDATE water_levels
+SET latitude = COALESCE(latitude, %(lat)s),
+    longitude = COALESCE(longitude, %(lon)s),
+    location = ST_SetSRID(ST_MakePoint(COALESCE(longitude, %(lon)s), COALESCE(latitude, %(lat)s)), 4326)
+WHERE latitude IS NULL OR longitude IS NULL OR location IS NULL;
+"""
+
+try:
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(SQL_BACKFILL, {"lat": DEFAULT_LAT, "lon": DEFAULT_LON})
+            fixed = cur.rowcount
+            # Refresh planner stats so the location indexes get used right away
+            cur.execute("ANALYZE water_levels;")
+    print(f"✅ Backfilled coordinates on {fixed} readings.")
+except Exception as e:
+    print(f"❌ Error: {e}")
@@ -4,13 +4,17 @@ Displays real-time water level data with maps, charts, and alerts
 """
 
 import streamlit as st
+import streamlit.components.v1 as components
 import requests
 import pandas as pd
+import numpy as np
+import time
+from collections import deque
+import orjson
 import plotly.graph_objects as go
-import plotly.express as px
 import folium
-from streamlit_folium import st_folium
 from config import API_URL
+from http_client import SESSION
 from datetime import datetime
 
 st.set_page_config(page_title="A.H.H.H. Blockage Detection", page_icon="🌊", layout="wide")
@@ -29,130 +33,396 @@ DANGER_PCT = 0.75 # 75% capacity = 35.625 cm = 14.025" (critical level)
 WARN_THRESHOLD = BASIN_HEIGHT_CM * WARN_PCT
 ALERT_THRESHOLD = BASIN_HEIGHT_CM * ALERT_PCT
 DANGER_THRESHOLD = BASIN_HEIGHT_CM * DANGER_PCT
+# cm -> % of basin capacity in a single multiply
+CAPACITY_MULT = 100.0 / BASIN_HEIGHT_CM
+
+# Capacity % bin edges for the status codes: [0, 25) normal, [25, 50) warning, [50, 75) alert, 75+ danger
+STATUS_THRESHOLDS = np.array([WARN_PCT, ALERT_PCT, DANGER_PCT]) * 100
+STATUS_BINS = [-np.inf, *STATUS_THRESHOLDS, np.inf]
+# Pin colors / labels indexed by status code (0 = normal, 1 = warning, 2 = alert, 3 = danger)
+MARKER_COLORS = np.array(["green", "yellow", "orange", "red"])
+STATUS_LABELS = np.array(["🟢 NORMAL", "🟡 WARNING", "🟠 ALERT", "🔴 DANGER"])
+# Text colors for the status banner (gold reads better than yellow on white)
+STATUS_TEXT_COLORS = ("green", "gold", "orange", "red")
+# Capacity banner (Streamlit call, message) per status code when the hardware isn't alerting
+CAPACITY_BANNERS = (
+    (st.success, "🟢 NORMAL - Basin at {capacity:.1f}% capacity"),
+    (st.warning, "🟡 ELEVATED LEVEL! Basin at {capacity:.1f}% ({level:.1f} cm)"),
+    (st.warning, "🟠 HIGH LEVEL! Basin at {capacity:.1f}% ({level:.1f} cm)"),
+    (st.error, "🔴 CRITICAL CAPACITY! Basin at {capacity:.1f}% ({level:.1f} cm)"),
+)
+
+# Readings per API request, and the most the dashboard keeps in its rolling history
+API_PAGE_ROWS = 100
+# Each session polls the API at most this often
+FETCH_INTERVAL_SECONDS = 5
+HISTORY_MAX_ROWS = 5000
+
+# Most rows the readings table sends to the browser
+TABLE_MAX_ROWS = 500
+
+# Tables keep recorded_at as datetime64 and let the browser format it - no per-row strftime strings
+TABLE_COLUMN_CONFIG = {"recorded_at": st.column_config.DatetimeColumn("recorded_at", format="YYYY-MM-DD HH:mm:ss")}
+
+# Dtypes applied to the API payload - float32 is plenty for map coordinates. water_level_cm
+# stays float64: it is shown in popups and tables, where float32 prints 31.9 as 31.899999618530273
+NARROW_DTYPES = {'latitude': 'float32', 'longitude': 'float32',
+                 'id': 'int32', 'sensor_id': 'category'}
+
+# Alert types the backend accepts, plus a bucket for anything older/unexpected
+ALERT_TYPES = ['normal_reading', 'blockage_detected', 'blockage_cleared', 'unknown']
+
+# Most points the trend chart sends to the browser - more than a chart can show anyway
+TREND_MAX_POINTS = 2000
 
 def fetch_data(source='all'):
     """Pull the latest data from the Flask API
     
+    Each browser session keeps its own rolling history per source in st.session_state and
+    polls the API at most every FETCH_INTERVAL_SECONDS, so widget clicks don't each wait on
+    an HTTP round-trip; the Refresh button drops the history to force a reload. Returns
+    (version, readings) where version changes whenever the readings do. Raises
+    RequestException if the API is unreachable.
+    
     Args:
         source: 'all' (default), 'real', or 'simulated'
     """
-    try:
-        response = requests.get(f"{API_URL}?source={source}", timeout=5)
-        return response.json().get("data", []) if response.status_code == 200 else []
-    except requests.exceptions.RequestException:
-        # If the API isn't running, let the user know
-        st.error("❌ Cannot connect to backend API. Is Flask running?")
-        return []
+    # Not st.cache_data - that cache is shared by every session, and this state is per session
+    histories = st.session_state.setdefault("history", {})
+    state = histories.get(source)
+    if state is None:
+        state = histories[source] = {"etag": None, "last_id": 0, "fetched_at": 0.0,
+                                     "rows": deque(maxlen=HISTORY_MAX_ROWS), "result": (None, [])}
+    if time.monotonic() - state["fetched_at"] < FETCH_INTERVAL_SECONDS:
+        return state["result"]
+    
+    # Only ask for readings newer than the last one we have; with the ETag the API answers
+    # 304 (no body, no SELECT) when nothing new has been recorded since
+    history = state["rows"]
+    params = {"source": source, "limit": API_PAGE_ROWS}
+    headers = {}
+    if history:
+        params["since_id"] = state["last_id"]
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+    response = SESSION.get(API_URL, params=params, headers=headers, timeout=5)
+    state["fetched_at"] = time.monotonic()
+    if response.status_code == 200:
+        # orjson parses the readings list several times faster than response.json()
+        new_rows = orjson.loads(response.content).get("data", [])
+        if len(new_rows) >= API_PAGE_ROWS:
+            # A full page means there may be a gap before it - start the history over
+            history.clear()
+        # The API sends newest-first; the history runs oldest-first
+        history.extend(reversed(new_rows))
+        state["last_id"] = max([state["last_id"]] + [row["id"] for row in new_rows])
+        state["etag"] = response.headers.get("ETag")
+        if history:
+            data = list(history)
+            # ids start over after reset_db.py, so the version also carries the oldest and newest
+            # timestamps - a rebuilt history never reuses a version cached before the reset
+            first, last = data[0], data[-1]
+            version = f"{first['id']}@{first['recorded_at']}-{last['id']}@{last['recorded_at']}-{len(data)}"
+            state["result"] = (version, data)
+    elif response.status_code != 304:
+        return None, []
+    return state["result"]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_geojson():
+    """Download the GeoJSON export from the Flask API - cached for a minute
+    
+    Returns the FeatureCollection text, or None if the API has nothing to export.
+    Raises RequestException if the API is unreachable.
+    """
+    api_base = API_URL.rsplit('/api/', 1)[0]
+    response = SESSION.get(f"{api_base}/api/export/geojson", timeout=5)
+    if response.status_code != 200:
+        return None
+    return response.text
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_dataframe(source, version, _raw_data):
+    """Turn the API payload into a time-sorted DataFrame - cached, so unchanged data isn't re-parsed
+    
+    Args:
+        source: 'all', 'real', or 'simulated'
+        version: Version fetch_data returned with the payload
+        _raw_data: The readings themselves - not hashed, (source, version) identifies them
+    """
+    df = pd.DataFrame(_raw_data)
+    # Narrower dtypes - half the memory, and half the bytes when Plotly serializes the columns
+    df = df.astype({col: dtype for col, dtype in NARROW_DTYPES.items() if col in df.columns})
+    # The API formats timestamps as 'YYYY-MM-DD HH:MM:SS' - naming the format skips per-value guessing
+    df['recorded_at'] = pd.to_datetime(df['recorded_at'], format='%Y-%m-%d %H:%M:%S', cache=True)
+    # fetch_data's history is normally already oldest-first (and a raw API page newest-first,
+    # so flipping is enough) - only sort when neither holds
+    if df['recorded_at'].is_monotonic_decreasing and not df['recorded_at'].is_monotonic_increasing:
+        df = df.iloc[::-1]
+    elif not df['recorded_at'].is_monotonic_increasing:
+        df = df.sort_values('recorded_at')
+    
+    # Ensure alert fields exist (for compatibility with older data)
+    if 'capacity_percentage' not in df.columns:
+        df['capacity_percentage'] = df['water_level_cm'] * CAPACITY_MULT
+    if 'alert_status' not in df.columns:
+        df['alert_status'] = False
+    if 'alert_type' not in df.columns:
+        df['alert_type'] = 'normal_reading'
+    # Real bool + category dtypes instead of Python-object columns - smaller, and the
+    # alert filter below becomes a plain boolean mask
+    df['alert_status'] = df['alert_status'].fillna(False).astype(bool)
+    df['alert_type'] = pd.Categorical(df['alert_type'], categories=ALERT_TYPES).fillna('unknown')
+    
+    df['capacity_pct'] = df['capacity_percentage']
+    return add_status_cols(df)
+
+def status_code(capacity_pct):
+    """Status code for a single reading - 0 normal, 1 warning, 2 alert, 3 danger
+    
+    Args:
+        capacity_pct: Basin capacity as a percentage (0-100)
+    """
+    # Binary search over the sorted thresholds instead of an if/elif chain
+    return int(np.searchsorted(STATUS_THRESHOLDS, capacity_pct, side='right'))
 
 def get_status_color(capacity_pct):
     """Determine if we're normal/warning/alert/danger and pick the display emoji + color
     
+    Returns (status code, label, color) so callers can reuse the code instead of classifying again
+    
     Args:
         capacity_pct: Basin capacity as a percentage (0-100)
     """
-    if capacity_pct >= DANGER_PCT * 100:
-        return f"🔴 DANGER ({capacity_pct:.1f}%)", "red"
-    elif capacity_pct >= ALERT_PCT * 100:
-        return f"🟠 ALERT ({capacity_pct:.1f}%)", "orange"
-    elif capacity_pct >= WARN_PCT * 100:
-        return f"🟡 WARNING ({capacity_pct:.1f}%)", "gold"
-    else:
-        return f"🟢 NORMAL ({capacity_pct:.1f}%)", "green"
+    code = status_code(capacity_pct)
+    return code, f"{STATUS_LABELS[code]} ({capacity_pct:.1f}%)", STATUS_TEXT_COLORS[code]
 
-def get_marker_color(capacity_pct):
-    """Pick the color for map pins based on capacity percentage
+def lttb_indices(x, y, n_out):
+    """Pick which points to plot with Largest-Triangle-Three-Buckets downsampling
+    
+    Keeps the first and last point, then from each bucket the point forming the largest
+    triangle with the previous pick and the next bucket's average - the visual shape
+    survives while the point count drops to n_out.
     
     Args:
-        capacity_pct: Basin capacity as a percentage (0-100)
+        x: Timestamps (datetime64) or numbers, sorted ascending
+        y: Values, same length as x
+        n_out: Number of points to keep
     """
-    if capacity_pct >= DANGER_PCT * 100:
-        return "red"
-    elif capacity_pct >= ALERT_PCT * 100:
-        return "orange"
-    elif capacity_pct >= WARN_PCT * 100:
-        return "yellow"
-    else:
-        return "green"
+    n = len(x)
+    if n_out < 3 or n <= n_out:
+        return np.arange(n)
+    
+    x = x.astype('int64') if np.issubdtype(x.dtype, np.datetime64) else x
+    x = (x - x[0]).astype(float)
+    y = y.astype(float)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Every bucket's average in one reduceat pass; bucket i compares against bucket i + 1's
+    # average, and the last bucket against the final point
+    sizes = np.diff(edges)
+    next_x = np.append((np.add.reduceat(x[:n - 1], edges[:-1]) / sizes)[1:], x[-1])
+    next_y = np.append((np.add.reduceat(y[:n - 1], edges[:-1]) / sizes)[1:], y[-1])
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[prev] - next_x[i]) * (y[start:end] - y[prev])
+                      - (x[prev] - x[start:end]) * (next_y[i] - y[prev]))
+        prev = start + int(np.argmax(area))
+        picked[i + 1] = prev
+    return picked
+
+# Display-only columns add_status_cols puts on the frame - kept out of the CSV export
+STATUS_COLUMNS = ['status_code', 'marker_color', 'status_label']
+
+def add_status_cols(df):
+    """Classify every reading at once - adds status_code, marker_color and status_label columns
+    
+    One vectorized binning of the whole capacity column replaces per-row get_status_color
+    calls wherever the whole frame is needed.
+    """
+    # pd.cut bins the whole column in one pass (left-closed, so 25.0% already counts as warning):
+    # 0 = normal .. 3 = danger, then the colors/labels are a single array lookup
+    codes = pd.cut(df['capacity_pct'], bins=STATUS_BINS, labels=False, right=False)
+    codes = codes.fillna(0).to_numpy().astype(np.int8)
+    df['status_code'] = codes
+    df['marker_color'] = MARKER_COLORS[codes]
+    df['status_label'] = STATUS_LABELS[codes]
+    return df
+
+def sensor_means(df):
+    """Average water level per sensor - np.bincount over category codes instead of a groupby
+    
+    With only a handful of sensors, groupby's setup cost dwarfs the actual arithmetic.
+    """
+    sensors = df['sensor_id'].astype('category').cat.remove_unused_categories()
+    codes = sensors.cat.codes.to_numpy()
+    counts = np.bincount(codes)
+    sums = np.bincount(codes, weights=df['water_level_cm'].to_numpy(dtype=float))
+    return pd.DataFrame({'sensor_id': sensors.cat.categories, 'water_level_cm': sums / counts})
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def to_csv_bytes(source, version, _df):
+    """Encode the readings as CSV once per version of the data - not on every rerun
+    
+    Exports the API's fields plus capacity_pct; the map styling columns are left out.
+    
+    Args:
+        source: 'all', 'real', or 'simulated'
+        version: Version fetch_data returned with the readings in _df
+        _df: Readings DataFrame (not hashed, (source, version) identifies it)
+    """
+    return _df.drop(columns=STATUS_COLUMNS, errors='ignore').to_csv(index=False).encode()
+
+@st.cache_resource(max_entries=8)
+def build_trend_figure(source, version, _df):
+    """Build the water level trend chart once per version of the data
+    
+    Args:
+        source: 'all', 'real', or 'simulated'
+        version: Version fetch_data returned with the readings in _df
+        _df: Readings DataFrame, sorted by recorded_at (not hashed, (source, version) identifies it)
+    """
+    # Long histories are thinned to TREND_MAX_POINTS with LTTB (keeps the peaks and dips)
+    # and drawn with WebGL so the browser doesn't choke on thousands of SVG points
+    times, levels = _df['recorded_at'].to_numpy(), _df['water_level_cm'].to_numpy()
+    trend_idx = lttb_indices(times, levels, TREND_MAX_POINTS)
+    fig_trend = go.Figure()
+    fig_trend.add_trace(go.Scattergl(x=times[trend_idx], y=levels[trend_idx], mode='lines+markers',
+                                     name='Level', line=dict(color='#0066cc', width=2), fill='tozeroy'))
+    # Add the threshold lines so you can see when we're approaching danger
+    fig_trend.add_hline(y=WARN_THRESHOLD, line_dash="dash", line_color="yellow", annotation_text="Warning (25%)")
+    fig_trend.add_hline(y=ALERT_THRESHOLD, line_dash="dash", line_color="orange", annotation_text="Alert (50%)")
+    fig_trend.add_hline(y=DANGER_THRESHOLD, line_dash="dash", line_color="red", annotation_text="Danger (75%)")
+    # Constant uirevision keeps the user's zoom/pan when new data arrives
+    fig_trend.update_layout(height=400, uirevision='trend')
+    return fig_trend
+
+@st.cache_resource(max_entries=8)
+def build_bar_figure(source, version, _df):
+    """Build the per-sensor average bar chart once per version of the data
+    
+    Args:
+        source: 'all', 'real', or 'simulated'
+        version: Version fetch_data returned with the readings in _df
+        _df: Readings DataFrame (not hashed, (source, version) identifies it)
+    """
+    sensor_stats = sensor_means(_df)
+    means = sensor_stats['water_level_cm'].to_numpy()
+    # go.Bar straight from arrays - px.bar would re-infer columns and build a frame per call
+    fig_bar = go.Figure(go.Bar(x=sensor_stats['sensor_id'].to_numpy(dtype=str), y=means,
+                               marker=dict(color=means, colorscale='RdYlGn_r', showscale=True,
+                                           colorbar=dict(title='water_level_cm'))))
+    fig_bar.update_layout(height=400, uirevision='bar', xaxis_title='sensor_id', yaxis_title='water_level_cm')
+    return fig_bar
 
 def create_sensor_map(df):
-    """Build an interactive map showing where all the sensors are and their current status"""
+    """Build an interactive map showing where all the sensors are and their current status
+    
+    Returns the map as standalone HTML (one pin per sensor, at its latest reading),
+    or None if there is nothing to plot
+    """
     # Skip if we don't have any location data
     if df.empty or df[['latitude', 'longitude']].isnull().all().any():
         st.warning("No geospatial data available.")
         return None
     
-    df_map = df.dropna(subset=['latitude', 'longitude'])
+    # One pin per sensor with its latest reading (df is oldest-first, so keep the last row)
+    df_map = df.dropna(subset=['latitude', 'longitude']).drop_duplicates('sensor_id', keep='last')
     if df_map.empty:
         return None
+    df_map = df_map.sort_values('sensor_id')
+    
+    # Only the columns the map actually shows go into the cache key, rounded to what the
+    # popups display so jitter below 0.1 cm doesn't force a re-render
+    rows = tuple(zip(df_map['sensor_id'].values, df_map['latitude'].values, df_map['longitude'].values,
+                     df_map['water_level_cm'].round(1).values, df_map['capacity_pct'].round(1).values,
+                     df_map['recorded_at'].astype(str).values,
+                     df_map['marker_color'].values, df_map['status_label'].values))
+    return build_map_html(rows)
+
+def marker_style(feature):
+    """GeoJSON style hook - colors each circle by its reading's status"""
+    color = feature["properties"]["marker_color"]
+    return {"color": color, "fillColor": color}
+
+@st.cache_resource(max_entries=8)
+def build_map_html(rows):
+    """Render the Folium map once per distinct set of readings - reruns for unrelated widgets reuse the HTML
     
+    Args:
+        rows: Tuple of (sensor_id, latitude, longitude, water_level_cm, capacity_pct, recorded_at,
+              marker_color, status_label) tuples
+    """
     # Center the map on the average location of all sensors
-    center_lat = df_map['latitude'].mean()
-    center_lon = df_map['longitude'].mean()
+    center_lat = sum(row[1] for row in rows) / len(rows)
+    center_lon = sum(row[2] for row in rows) / len(rows)
     
     # Create the base map
     m = folium.Map(location=[center_lat, center_lon], zoom_start=12, tiles="OpenStreetMap")
     
-    # Add a pin for each sensor with its status
-    for idx, row in df_map.iterrows():
-        status_text, _ = get_status_color(row['capacity_pct'])
-        marker_color = get_marker_color(row['capacity_pct'])
-        
-        popup_text = f"""
-        <b>{row['sensor_id']}</b><br>
-        Level: <b>{row['water_level_cm']} cm</b> ({row['capacity_pct']:.1f}%)<br>
-        Status: {status_text}<br>
-        Time: {row['recorded_at']}
-        """
-        
-        folium.Marker(
-            location=[row['latitude'], row['longitude']],
-            popup=folium.Popup(popup_text, max_width=250),
-            tooltip=f"{row['sensor_id']}: {row['water_level_cm']} cm ({row['capacity_pct']:.1f}%)",
-            icon=folium.Icon(color=marker_color, icon="tint", prefix="fa")
-        ).add_to(m)
-    
-    return m
+    # All pins go into one GeoJSON layer - a single Leaflet layer and one JSON blob
+    # instead of a separate Marker (and popup) object per reading. Pins are plain SVG circles,
+    # much lighter to draw than FontAwesome icon markers
+    features = [{
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [float(longitude), float(latitude)]},
+        "properties": {
+            "marker_color": str(marker_color),
+            "sensor_id": str(sensor_id),
+            "level": f"{water_level_cm} cm ({capacity_pct:.1f}%)",
+            "status": f"{status_label} ({capacity_pct:.1f}%)",
+            "time": recorded_at,
+            "tooltip": f"{sensor_id}: {water_level_cm} cm ({capacity_pct:.1f}%)",
+        },
+    } for sensor_id, latitude, longitude, water_level_cm, capacity_pct, recorded_at, marker_color, status_label in rows]
+    
+    sensors = folium.FeatureGroup(name="sensors").add_to(m)
+    folium.GeoJson(
+        {"type": "FeatureCollection", "features": features},
+        marker=folium.CircleMarker(radius=8, weight=2, fill=True, fill_opacity=0.85),
+        style_function=marker_style,
+        popup=folium.GeoJsonPopup(fields=["sensor_id", "level", "status", "time"],
+                                  aliases=["Sensor", "Level", "Status", "Time"], max_width=250),
+        tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+    ).add_to(sensors)
+    
+    return m.get_root().render()
 
-# Sidebar control for data source
-with st.sidebar:
-    st.title("⚙️ Settings")
-    source = st.radio(
-        "Data Source",
-        options=['Real Hardware', 'Simulation Data', 'All Data'],
-        index=2,
-        help="Filter which data source to display"
-    )
+@st.fragment(run_every=5)
+def live_panel(source_param):
+    """Latest-reading metrics and alert banner - reruns on its own every 5 seconds
     
-    # Map display options to API parameter values
-    source_param = {'Real Hardware': 'real', 'Simulation Data': 'simulated', 'All Data': 'all'}[source]
-
-raw_data = fetch_data(source=source_param)
-
-if raw_data:
-    df = pd.DataFrame(raw_data)
-    df['recorded_at'] = pd.to_datetime(df['recorded_at'])
-    df = df.sort_values('recorded_at')
+    Only this block (and history_panel) refreshes on the timer; the map and exports stay
+    put until a full rerun (Refresh button or a widget change).
     
-    # Ensure alert fields exist (for compatibility with older data)
-    if 'capacity_percentage' not in df.columns:
-        df['capacity_percentage'] = (df['water_level_cm'] / BASIN_HEIGHT_CM) * 100
-    if 'alert_status' not in df.columns:
-        df['alert_status'] = False
-    if 'alert_type' not in df.columns:
-        df['alert_type'] = 'normal_reading'
-    
-    df['capacity_pct'] = df['capacity_percentage']
+    Args:
+        source_param: 'all', 'real', or 'simulated'
+    """
+    try:
+        version, raw_data = fetch_data(source=source_param)
+    except requests.exceptions.RequestException:
+        st.error("❌ Cannot connect to backend API. Is Flask running?")
+        return
+    if not raw_data:
+        return
+    df = build_dataframe(source_param, version, raw_data)
     
     latest = df.iloc[-1]
-    status_text, status_color = get_status_color(latest['capacity_pct'])
+    level, capacity = latest['water_level_cm'], latest['capacity_pct']
+    # Classify the latest reading once and reuse it for the metric and the banner
+    code, status_text, _ = get_status_color(capacity)
     
     # Metrics
     col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
-        st.metric("Latest Reading", f"{latest['water_level_cm']} cm", status_text, delta_color="off")
+        st.metric("Latest Reading", f"{level} cm", status_text, delta_color="off")
     with col2:
         avg_level = df['water_level_cm'].mean()
-        st.metric("Average", f"{avg_level:.1f} cm", f"{latest['water_level_cm'] - avg_level:.1f} cm")
+        st.metric("Average", f"{avg_level:.1f} cm", f"{level - avg_level:.1f} cm")
     with col3:
         # Show the highest reading we've seen
         st.metric("Peak", f"{df['water_level_cm'].max():.1f} cm")
@@ -174,60 +444,53 @@ if raw_data:
         if latest.get('alert_status', False):
             alert_type = latest.get('alert_type', 'unknown')
             if alert_type == 'blockage_detected':
-                st.error(f"🚨 BLOCKAGE DETECTED! ({latest['capacity_pct']:.1f}% capacity) - Type: blockage_detected")
+                st.error(f"🚨 BLOCKAGE DETECTED! ({capacity:.1f}% capacity) - Type: blockage_detected")
             elif alert_type == 'blockage_cleared':
                 st.success(f"✅ BLOCKAGE CLEARED (Regularization Alert) - Type: blockage_cleared")
             else:
-                st.info(f"📊 Normal Reading - Capacity: {latest['capacity_pct']:.1f}%")
+                st.info(f"📊 Normal Reading - Capacity: {capacity:.1f}%")
         else:
-            # Capacity-based warnings
-            if latest['capacity_pct'] >= DANGER_PCT * 100:
-                st.error(f"🔴 CRITICAL CAPACITY! Basin at {latest['capacity_pct']:.1f}% ({latest['water_level_cm']:.1f} cm)")
-            elif latest['capacity_pct'] >= ALERT_PCT * 100:
-                st.warning(f"🟠 HIGH LEVEL! Basin at {latest['capacity_pct']:.1f}% ({latest['water_level_cm']:.1f} cm)")
-            elif latest['capacity_pct'] >= WARN_PCT * 100:
-                st.warning(f"🟡 ELEVATED LEVEL! Basin at {latest['capacity_pct']:.1f}% ({latest['water_level_cm']:.1f} cm)")
-            else:
-                st.success(f"🟢 NORMAL - Basin at {latest['capacity_pct']:.1f}% capacity")
+            # Capacity-based warnings - pick the banner by status code instead of re-comparing thresholds
+            show_banner, message = CAPACITY_BANNERS[code]
+            show_banner(message.format(capacity=capacity, level=level))
     
     with col_alert2:
         st.metric("Alert Status", "🚨 ACTIVE" if latest.get('alert_status', False) else "✓ Normal", 
                  latest.get('alert_type', 'N/A'))
     
     st.markdown("---")
+
+@st.fragment(run_every=5)
+def history_panel(source_param):
+    """Trend/sensor charts, stats, alert history and readings table - reruns every 5 seconds
     
-    # Show where all the sensors are located
-    st.subheader("🗺️ Sensor Location Map")
-    sensor_map = create_sensor_map(df)
-    if sensor_map:
-        st_folium(sensor_map, width=1400, height=500)
+    Like live_panel, this refreshes on its own timer so new readings show up without
+    rebuilding the map or the rest of the page.
     
-    st.markdown("---")
+    Args:
+        source_param: 'all', 'real', or 'simulated'
+    """
+    try:
+        version, raw_data = fetch_data(source=source_param)
+    except requests.exceptions.RequestException:
+        # live_panel above already reports the outage
+        return
+    if not raw_data:
+        return
+    df = build_dataframe(source_param, version, raw_data)
     
-    # Charts section
+    # Charts section - figures are only rebuilt when the readings behind them change
     col1, col2 = st.columns(2)
     
     with col1:
         # Trend line showing water level over time with threshold lines
         st.subheader("📈 Water Level Over Time")
-        fig_trend = go.Figure()
-        fig_trend.add_trace(go.Scatter(x=df['recorded_at'], y=df['water_level_cm'], mode='lines+markers',
-                                      name='Level', line=dict(color='#0066cc', width=2), fill='tozeroy'))
-        # Add the threshold lines so you can see when we're approaching danger
-        fig_trend.add_hline(y=WARN_THRESHOLD, line_dash="dash", line_color="yellow", annotation_text="Warning (25%)")
-        fig_trend.add_hline(y=ALERT_THRESHOLD, line_dash="dash", line_color="orange", annotation_text="Alert (50%)")
-        fig_trend.add_hline(y=DANGER_THRESHOLD, line_dash="dash", line_color="red", annotation_text="Danger (75%)")
-        fig_trend.update_layout(height=400)
-        st.plotly_chart(fig_trend, use_container_width=True)
+        st.plotly_chart(build_trend_figure(source_param, version, df), use_container_width=True)
     
     with col2:
         # Bar chart comparing average levels across sensors
         st.subheader("📊 Levels by Sensor")
-        sensor_stats = df.groupby('sensor_id')['water_level_cm'].mean().reset_index()
-        fig_bar = px.bar(sensor_stats, x='sensor_id', y='water_level_cm', color='water_level_cm',
-                        color_continuous_scale='RdYlGn_r')
-        fig_bar.update_layout(height=400)
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(build_bar_figure(source_param, version, df), use_container_width=True)
     
     st.markdown("---")
     
@@ -243,13 +506,12 @@ if raw_data:
     
     # Alert history section per BAMBI.pdf metrics (alert response time tracking)
     st.subheader("🚨 Alert History (BAMBI.pdf Spec)")
-    alerts_df = df[df['alert_status'] == True].copy() if 'alert_status' in df.columns else pd.DataFrame()
+    alerts_df = df.loc[df['alert_status']]
     
     if not alerts_df.empty:
-        alerts_display = alerts_df[['recorded_at', 'sensor_id', 'water_level_cm', 'alert_type', 'capacity_percentage']].copy()
-        alerts_display['recorded_at'] = alerts_display['recorded_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        alerts_display = alerts_display.sort_values('recorded_at', ascending=False)
-        st.dataframe(alerts_display, use_container_width=True, hide_index=True)
+        # df is oldest-first, so newest-first is just the reverse
+        alerts_display = alerts_df[['recorded_at', 'sensor_id', 'water_level_cm', 'alert_type', 'capacity_percentage']].iloc[::-1]
+        st.dataframe(alerts_display, column_config=TABLE_COLUMN_CONFIG, use_container_width=True, hide_index=True)
         st.metric("Total Alerts", len(alerts_df))
     else:
         st.info("✓ No alerts recorded during this period")
@@ -258,41 +520,89 @@ if raw_data:
     
     # Data table
     st.subheader("🗂️ All Readings")
-    display_df = df[['recorded_at', 'sensor_id', 'water_level_cm']].copy()
-    display_df['recorded_at'] = display_df['recorded_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    # Only the newest TABLE_MAX_ROWS go to the browser - nobody scrolls the whole history
+    display_df = df[['recorded_at', 'sensor_id', 'water_level_cm']].tail(TABLE_MAX_ROWS)
     # Show newest first
-    st.dataframe(display_df.sort_values('recorded_at', ascending=False), use_container_width=True, hide_index=True)
+    st.dataframe(display_df.iloc[::-1], column_config=TABLE_COLUMN_CONFIG, use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+
+@st.cache_resource
+def build_empty_map_html():
+    """Render the standby map once - it never changes until real data arrives"""
+    # Centers the map on the default coordinates from the Arduino firmware
+    m_empty = folium.Map(location=[8.7465, 127.3851], zoom_start=12, tiles="OpenStreetMap")
+    return m_empty.get_root().render()
+
+# Sidebar control for data source
+with st.sidebar:
+    st.title("⚙️ Settings")
+    source = st.radio(
+        "Data Source",
+        options=['Real Hardware', 'Simulation Data', 'All Data'],
+        index=2,
+        help="Filter which data source to display"
+    )
+    
+    # Map display options to API parameter values
+    source_param = {'Real Hardware': 'real', 'Simulation Data': 'simulated', 'All Data': 'all'}[source]
+
+try:
+    version, raw_data = fetch_data(source=source_param)
+except requests.exceptions.RequestException:
+    # If the API isn't running, let the user know
+    st.error("❌ Cannot connect to backend API. Is Flask running?")
+    version, raw_data = None, []
+
+if raw_data:
+    df = build_dataframe(source_param, version, raw_data)
+    
+    live_panel(source_param)
+    
+    # Show where all the sensors are located
+    st.subheader("🗺️ Sensor Location Map")
+    sensor_map_html = create_sensor_map(df)
+    if sensor_map_html:
+        # Plain HTML embed - the map is display-only, so no st_folium round-trip is needed
+        components.html(sensor_map_html, height=500)
     
     st.markdown("---")
     
+    history_panel(source_param)
+    
     # Download options
     st.subheader("💾 Download/Export Data")
     col1, col2, col3 = st.columns(3)
     
     with col1:
         # Export as CSV for Excel/spreadsheets
-        csv = df.to_csv(index=False)
-        st.download_button("� Download CSV", csv,
+        st.download_button("� Download CSV", to_csv_bytes(source_param, version, df),
                           file_name=f"water_levels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                           mime="text/csv")
     
     with col2:
-        # Export as GeoJSON for QGIS/mapping
-        try:
-            api_base = API_URL.rsplit('/api/', 1)[0]
-            response = requests.get(f"{api_base}/api/export/geojson", timeout=5)
-            if response.status_code == 200:
-                st.download_button("�️ Download GeoJSON", response.text,
-                                  file_name=f"water_levels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.geojson",
-                                  mime="application/json")
-        except:
-            st.info("GeoJSON unavailable")
+        # Export as GeoJSON for QGIS/mapping - only fetched once someone asks for it,
+        # not on every rerun
+        if st.button("🗺️ Prepare GeoJSON"):
+            try:
+                st.session_state['geojson'] = fetch_geojson()
+            except requests.exceptions.RequestException:
+                st.session_state['geojson'] = None
+            if not st.session_state['geojson']:
+                st.info("GeoJSON unavailable")
+        if st.session_state.get('geojson'):
+            st.download_button("�️ Download GeoJSON", st.session_state['geojson'],
+                              file_name=f"water_levels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.geojson",
+                              mime="application/json")
     
     with col3:
         st.info("💡 Import GeoJSON into QGIS for spatial analysis")
     
     st.markdown("---")
     if st.button("🔄 Refresh Data", use_container_width=True):
+        # Drop this session's history so a manual refresh always hits the API and reloads
+        # from scratch (picks up a reset database, whose ids start over)
+        st.session_state.pop("history", None)
         st.rerun()
     
     st.caption(f"Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -314,9 +624,7 @@ else:
     # 1. Empty Map Layout
     st.subheader("🗺️ Sensor Location Map")
     st.caption("Awaiting live GPS coordinates. Displaying default monitoring region.")
-    # Centers the map on the default coordinates from the Arduino firmware
-    m_empty = folium.Map(location=[8.7465, 127.3851], zoom_start=12, tiles="OpenStreetMap")
-    st_folium(m_empty, width=1400, height=500)
+    components.html(build_empty_map_html(), height=500)
     
     st.markdown("---")
     
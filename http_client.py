@@ -0,0 +1,24 @@
+"""
+HTTP Client - Shared keep-alive session for talking to the Flask API
+Import SESSION instead of calling requests.get/post directly
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def make_adapter(pool_maxsize=10):
+    """Connection-pooling adapter with a couple of quick retries for blips (API restarting)
+    
+    Args:
+        pool_maxsize: Most connections kept open per host - raise it for concurrent callers
+    """
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize,
+                       max_retries=Retry(total=2, backoff_factor=0.1))
+
+# One pooled session per process - every call reuses an open TCP connection to the API
+# instead of paying a fresh handshake
+SESSION = requests.Session()
+_adapter = make_adapter()
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
@@ -0,0 +1,40 @@
+"""
+QGIS Export - Save the GeoJSON export to a file you can drag into QGIS
+Run: python qgis_export.py [--limit 500] [--output water_levels.geojson]
+"""
+
+import argparse
+import shutil
+from config import API_URL
+from http_client import SESSION
+
+def download_geojson(output_file, limit=100):
+    """Stream the GeoJSON export straight to disk - the body is never parsed or held in memory
+    
+    Args:
+        output_file: Where to write the .geojson file
+        limit: Number of most recent located readings (max 5000)
+    """
+    api_base = API_URL.rsplit('/api/', 1)[0]
+    with SESSION.get(f"{api_base}/api/export/geojson", params={"limit": limit},
+                     stream=True, timeout=30) as response:
+        response.raise_for_status()
+        # Let urllib3 undo any gzip/deflate while copying in fixed-size chunks
+        response.raw.decode_content = True
+        with open(output_file, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, 64 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="Download sensor readings as GeoJSON for QGIS")
+    parser.add_argument("--limit", type=int, default=100, help="Number of recent readings (default: 100, max: 5000)")
+    parser.add_argument("--output", default="water_levels.geojson", help="Output file (default: water_levels.geojson)")
+    args = parser.parse_args()
+    
+    try:
+        download_geojson(args.output, args.limit)
+        print(f"✅ Saved {args.output} - add it in QGIS via Layer > Add Layer > Add Vector Layer")
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+
+if __name__ == "__main__":
+    main()
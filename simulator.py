@@ -1,56 +1,116 @@
 """
 SIMULATOR - Test Data Generator per BAMBI.pdf validation
 Generates realistic test data to demonstrate A.H.H.H. system performance
-Run multiple times: python simulator.py
+Run: python simulator.py                              (one reading)
+     python simulator.py --count 50 --interval 1      (a reading every second, one connection)
+     python simulator.py --count 1000 --concurrency 50 (load test - 50 requests in flight)
 """
 
-import requests
-from config import API_URL
+import argparse
+import orjson
 import random
-from datetime import datetime
-
-# Simulate realistic water level patterns in catch basin (47.5cm height)
-# Normal readings: 20-35cm (mostly), Blockage readings: 35-55cm (occasional)
-should_trigger_blockage = random.random() < 0.35  # 35% chance of blockage reading
-if should_trigger_blockage:
-    water_level = round(random.uniform(35, 55), 1)  # High levels trigger blockage
-else:
-    water_level = round(random.uniform(20, 35), 1)  # Normal background levels
-
-power_consumption = round(random.uniform(0.3, 1.2), 2)
-mcu_timestamp = datetime.utcnow().isoformat() + "Z"
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config import API_URL
+from http_client import SESSION, make_adapter
 
 # Per BAMBI.pdf: Determine alert status based on thresholds (25%, 50%, 75%)
 BASIN_HEIGHT = 47.5
-capacity_pct = (water_level / BASIN_HEIGHT) * 100
-alert_triggered = capacity_pct >= 25  # 25% = 11.875cm blockage threshold
-alert_type = "normal_reading"
-
-if alert_triggered:
-    if capacity_pct >= 75:
-        alert_type = "blockage_escalated_critical"
-    elif capacity_pct >= 50:
-        alert_type = "blockage_escalated"
-    else:
-        alert_type = "blockage_detected"
-
-try:
-    response = requests.post(API_URL, json={
-        "sensor_id": "Ternate_Sensor_02",
-        "water_level_cm": water_level,
-        "latitude": 8.7465,
-        "longitude": 127.3851,
-        "power_consumption_watts": power_consumption,
-        "mcu_timestamp": mcu_timestamp,
-        "is_simulated": True,
-        "alert_status": alert_triggered,
-        "alert_type": alert_type
-    }, timeout=5)
+
+# orjson serializes the body in C - noticeably faster than requests' json= at load-test rates
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Built once and updated in place for every reading - only the measured fields change
+payload = {
+    "sensor_id": "Ternate_Sensor_02",
+    "water_level_cm": 0.0,
+    "latitude": 8.7465,
+    "longitude": 127.3851,
+    "power_consumption_watts": 0.0,
+    "mcu_timestamp": "",
+    "is_simulated": True,
+    "alert_status": False,
+    "alert_type": "normal_reading"
+}
+
+def next_reading(payload):
+    """Fill the payload with a fresh simulated reading - returns its capacity percentage
     
-    if response.status_code == 201:
-        status_emoji = "🚨" if alert_triggered else "✓"
-        print(f"{status_emoji} OK | Level: {water_level}cm ({capacity_pct:.1f}%) | Alert: {alert_type}")
+    Args:
+        payload: The request body dict to update in place
+    """
+    # Simulate realistic water level patterns in catch basin (47.5cm height)
+    # Normal readings: 20-35cm (mostly), Blockage readings: 35-55cm (occasional)
+    should_trigger_blockage = random.random() < 0.35  # 35% chance of blockage reading
+    if should_trigger_blockage:
+        water_level = round(random.uniform(35, 55), 1)  # High levels trigger blockage
     else:
-        print(f"⚠️ Error {response.status_code}")
-except Exception as e:
-    print(f"❌ Connection failed: {e}")
+        water_level = round(random.uniform(20, 35), 1)  # Normal background levels
+    
+    capacity_pct = (water_level / BASIN_HEIGHT) * 100
+    alert_triggered = capacity_pct >= 25  # 25% = 11.875cm blockage threshold
+    alert_type = "normal_reading"
+    
+    if alert_triggered:
+        if capacity_pct >= 75:
+            alert_type = "blockage_escalated_critical"
+        elif capacity_pct >= 50:
+            alert_type = "blockage_escalated"
+        else:
+            alert_type = "blockage_detected"
+    
+    payload["water_level_cm"] = water_level
+    payload["power_consumption_watts"] = round(random.uniform(0.3, 1.2), 2)
+    # Millisecond precision is all Postgres needs and skips the slower microsecond formatting
+    payload["mcu_timestamp"] = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    payload["alert_status"] = alert_triggered
+    payload["alert_type"] = alert_type
+    return capacity_pct
+
+def send_reading(reading, capacity_pct):
+    """POST one reading to the API and print how it went
+    
+    Args:
+        reading: Request body dict
+        capacity_pct: Its capacity percentage, for the log line
+    """
+    try:
+        # Every POST reuses one of the session's keep-alive connections
+        response = SESSION.post(API_URL, data=orjson.dumps(reading), headers=JSON_HEADERS, timeout=5)
+        
+        if response.status_code == 201:
+            status_emoji = "🚨" if reading["alert_status"] else "✓"
+            print(f"{status_emoji} OK | Level: {reading['water_level_cm']}cm ({capacity_pct:.1f}%) | Alert: {reading['alert_type']}")
+        else:
+            print(f"⚠️ Error {response.status_code}")
+    except Exception as e:
+        print(f"❌ Connection failed: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Send simulated water level readings to the API")
+    parser.add_argument("--count", type=int, default=1, help="Number of readings to send (default: 1)")
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds to wait between readings (default: 0)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Requests in flight at once, for load testing the backend (default: 1)")
+    args = parser.parse_args()
+    
+    if args.concurrency <= 1:
+        for i in range(args.count):
+            if i and args.interval > 0:
+                time.sleep(args.interval)
+            send_reading(payload, next_reading(payload))
+        return
+    
+    # Load test: worker threads share the session, so give it a connection per worker.
+    # Each in-flight request needs its own body, so readings are copies of the template
+    SESSION.mount('http://', make_adapter(args.concurrency))
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.count):
+            if i and args.interval > 0:
+                time.sleep(args.interval)
+            reading = dict(payload)
+            pool.submit(send_reading, reading, next_reading(reading))
+
+if __name__ == "__main__":
+    main()
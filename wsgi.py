@@ -0,0 +1,15 @@
+"""
+WSGI ENTRYPOINT - Production server for the Flask backend
+Runs backend.py under gunicorn with gevent workers so slow DB calls don't block other requests
+Run: gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:5000 wsgi:app
+"""
+
+# Patch the standard library before anything else imports sockets/threads
+from gevent import monkey
+monkey.patch_all()
+
+# Make psycopg2's blocking socket waits yield to the gevent loop instead of stalling the worker
+from psycogreen.gevent import patch_psycopg
+patch_psycopg()
+
+from backend import app  # noqa: E402